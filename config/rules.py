@@ -1,4 +1,5 @@
 # Rules for theoretical charge calculation based on connection level and project phase
+import numpy as np
 
 # Mapping of connection level and phase to theoretical charge (NB JH)
 THEORETICAL_CHARGE_RULES = {
@@ -74,6 +75,33 @@ THEORETICAL_CHARGE_RULES = {
     }
 }
 
+# Flattened (connection level, project phase) -> theoretical charge lookup table
+THEORETICAL_CHARGE_TABLE = {
+    (connection_level, project_phase): charge
+    for connection_level, phase_rules in THEORETICAL_CHARGE_RULES.items()
+    for project_phase, charge in phase_rules.items()
+}
+
+# "Connexion EDI Sortante Pilote" uses the "Connexion EDI Pilote" rules
+THEORETICAL_CHARGE_TABLE.update({
+    ("Connexion EDI Sortante Pilote", project_phase): charge
+    for project_phase, charge in THEORETICAL_CHARGE_RULES["Connexion EDI Pilote"].items()
+})
+
+# Dense array of the same table, indexed by position in these two lists
+THEORETICAL_CHARGE_CONNECTION_LEVELS = list(dict.fromkeys(key[0] for key in THEORETICAL_CHARGE_TABLE))
+THEORETICAL_CHARGE_PHASES = list(dict.fromkeys(key[1] for key in THEORETICAL_CHARGE_TABLE))
+
+# The extra last row and column stay NaN so that unknown values (code -1) have no theoretical charge
+THEORETICAL_CHARGE_ARRAY = np.full(
+    (len(THEORETICAL_CHARGE_CONNECTION_LEVELS) + 1, len(THEORETICAL_CHARGE_PHASES) + 1), np.nan
+)
+for (connection_level, project_phase), charge in THEORETICAL_CHARGE_TABLE.items():
+    THEORETICAL_CHARGE_ARRAY[
+        THEORETICAL_CHARGE_CONNECTION_LEVELS.index(connection_level),
+        THEORETICAL_CHARGE_PHASES.index(project_phase)
+    ] = charge
+
 # RAF_RULES = {
 #     "Connexion EDI": {
 #         "Non démarré (nouveau projet)": 6,
@@ -159,21 +187,6 @@ def get_theoretical_charge(connection_level, project_phase):
     Returns:
         float: The theoretical charge value, or None if no matching rule is found
     """
-    # Handle empty values
-    if not connection_level or not project_phase:
-        return None
-
-    # Special case for "Connexion EDI Sortante Pilote" - use "Connexion EDI Pilote" rules
-    if connection_level == "Connexion EDI Sortante Pilote":
-        connection_level = "Connexion EDI Pilote"
-
-    # Check if connection level exists in rules
-    if connection_level not in THEORETICAL_CHARGE_RULES:
-        return None
-
-    # Check if project phase exists for this connection level
-    phase_rules = THEORETICAL_CHARGE_RULES[connection_level]
-    if project_phase not in phase_rules:
-        return None
+    # "Connexion EDI Sortante Pilote" is already aliased in the table
+    return THEORETICAL_CHARGE_TABLE.get((connection_level, project_phase))
 
-    return phase_rules[project_phase]
\ No newline at end of file
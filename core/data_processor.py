@@ -1,5 +1,23 @@
 import pandas as pd
-from config.rules import get_theoretical_charge
+from config.rules import (THEORETICAL_CHARGE_ARRAY, THEORETICAL_CHARGE_CONNECTION_LEVELS,
+                          THEORETICAL_CHARGE_PHASES)
+
+# Map common variations to standard THEORETICAL_CHARGE_RULES keys
+_CONNECTION_LEVEL_MAPPING = {
+    "Connexion Recette int": "Connexion EDI",
+    "Connexion Pré-produ": "Connexion EDI",
+    "Connexion Développe": "Connexion EDI",
+    "Connexion Recette": "Connexion EDI",
+    "Connexion Production": "Connexion EDI"
+}
+
+_PROJECT_PHASE_MAPPING = {
+    "Connexion Recette int": "Recette interne",
+    "Connexion Pré-produ": "Pré-production",
+    "Connexion Développe": "Développement",
+    "Connexion Recette": "Recette utilisateur",
+    "Connexion Production": "En production (VSR)"
+}
 
 
 class DataProcessor:
@@ -19,11 +37,26 @@ class DataProcessor:
         Returns:
             tuple: (bool, list) - Success status and list of missing columns
         """
-        available_columns = df.columns.tolist()
+        available_columns = set(df.columns)
         missing_columns = [col for col in required_columns if col not in available_columns]
 
         return len(missing_columns) == 0, missing_columns 
 
+    @staticmethod
+    def _prepare(df, columns, categorical_columns):
+        """
+        Keep only the needed columns and store low-cardinality ones as categories.
+
+        Args:
+            df (pandas.DataFrame): The source DataFrame
+            columns (list): Columns to keep
+            categorical_columns (list): Columns to convert to category dtype
+
+        Returns:
+            pandas.DataFrame: The reduced DataFrame
+        """
+        return df[columns].astype({col: 'category' for col in categorical_columns if col in columns})
+
     @staticmethod
     def create_connection_dict(deployments_df, column_name):
         """
@@ -36,15 +69,12 @@ class DataProcessor:
         Returns:
             dict: Mapping of project names to column values
         """
-        result_dict = {}
+        if column_name not in deployments_df.columns:
+            return {}
 
-        if column_name in deployments_df.columns:
-            for _, row in deployments_df.iterrows():
-                project_name = row['Nom']
-                if not pd.isna(row.get(column_name, pd.NA)):
-                    result_dict[project_name] = row[column_name]
-
-        return result_dict
+        # Drop empty values and zip the two columns in a single vectorized pass
+        values = deployments_df.set_index('Nom')[column_name].dropna()
+        return dict(zip(values.index.to_numpy(), values.to_numpy()))
 
     @staticmethod
     def calculate_charge_jh(df):
@@ -57,7 +87,8 @@ class DataProcessor:
         Returns:
             pandas.DataFrame: DataFrame with added Charge JH column
         """
-        df_copy = df.copy()
+        # Shallow copy: existing columns share their data, only Charge JH is allocated
+        df_copy = df.copy(deep=False)
         df_copy['Charge JH'] = df_copy['Soumise (h)'] / 8
         return df_copy
 
@@ -74,17 +105,8 @@ class DataProcessor:
         """
         if not connection_level:
             return None
-            
-        # Map common variations to standard keys
-        mapping = {
-            "Connexion Recette int": "Connexion EDI",
-            "Connexion Pré-produ": "Connexion EDI", 
-            "Connexion Développe": "Connexion EDI",
-            "Connexion Recette": "Connexion EDI",
-            "Connexion Production": "Connexion EDI"
-        }
-        
-        return mapping.get(connection_level, connection_level)
+
+        return _CONNECTION_LEVEL_MAPPING.get(connection_level, connection_level)
     
     @staticmethod
     def normalize_project_phase(project_phase):
@@ -99,35 +121,8 @@ class DataProcessor:
         """
         if not project_phase:
             return None
-            
-        # Map common variations to standard keys
-        mapping = {
-            "Connexion Recette int": "Recette interne",
-            "Connexion Pré-produ": "Pré-production",
-            "Connexion Développe": "Développement",
-            "Connexion Recette": "Recette utilisateur",
-            "Connexion Production": "En production (VSR)"
-        }
-        
-        return mapping.get(project_phase, project_phase)
-
-    @staticmethod
-    def calculate_theoretical_charge(connection_level, project_phase):
-        """
-        Calculate the theoretical charge based on connection level and project phase.
-
-        Args:
-            connection_level (str): The connection level
-            project_phase (str): The project phase
 
-        Returns:
-            float: The theoretical charge value
-        """
-        # Normalize the inputs
-        normalized_connection = DataProcessor.normalize_connection_level(connection_level)
-        normalized_phase = DataProcessor.normalize_project_phase(project_phase)
-        
-        return get_theoretical_charge(normalized_connection, normalized_phase)
+        return _PROJECT_PHASE_MAPPING.get(project_phase, project_phase)
 
     @staticmethod
     def create_projects_by_month_summary(deployments_df, phases_checked=None):
@@ -160,40 +155,43 @@ class DataProcessor:
         else:
             allowed_phases = phases_checked
         
-        # Create a copy and filter by allowed phases first
+        # Filter by allowed phases first, keeping only the columns we need
         columns_needed = ['Nom', 'Date d\'affectation', 'Phase du projet']
         if 'Date de création' in deployments_df.columns:
             columns_needed.append('Date de création')
         if 'Dernière Note' in deployments_df.columns:
             columns_needed.append('Dernière Note')
         
-        df_copy = deployments_df[columns_needed].copy()
-        df_copy = df_copy[df_copy['Phase du projet'].isin(allowed_phases)]
+        df_copy = deployments_df.loc[deployments_df['Phase du projet'].isin(allowed_phases), columns_needed]
         
         # Create a date column that uses Date d'affectation if available, otherwise Date de création
-        df_copy['Date effective'] = df_copy['Date d\'affectation']
-        
-        # If Date de création exists, use it as fallback for empty Date d'affectation
+        dates = df_copy['Date d\'affectation']
         if 'Date de création' in df_copy.columns:
             # Fill empty Date d'affectation with Date de création
-            mask = df_copy['Date d\'affectation'].isna() & df_copy['Date de création'].notna()
-            df_copy.loc[mask, 'Date effective'] = df_copy.loc[mask, 'Date de création']
-        
-        # Filter out rows with missing effective dates
-        df_copy = df_copy.dropna(subset=['Date effective'])
-        
-        if df_copy.empty:
-            return pd.DataFrame(columns=['Année', 'Nombre de projets', 'Nom du projet', 'Dernière Note'])
-        
-        # Convert dates to datetime
-        df_copy['Date effective'] = pd.to_datetime(df_copy['Date effective'], errors='coerce')
-        df_copy = df_copy.dropna(subset=['Date effective'])
+            dates = dates.combine_first(df_copy['Date de création'])
+        
+        # Convert dates to datetime (Excel dates usually already are), then filter out
+        # rows with missing or invalid effective dates in one pass
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            parsed = pd.to_datetime(dates, format='ISO8601', errors='coerce', cache=True)
+            # Fall back to the general parser only for values that are not ISO formatted
+            unparsed = parsed.isna() & dates.notna()
+            if unparsed.any():
+                parsed = parsed.where(~unparsed, pd.to_datetime(dates[unparsed], errors='coerce'))
+            # Mixed timezone-aware and naive dates come back as objects: parse the whole
+            # column the general way instead, normalizing to UTC if that still fails
+            if not pd.api.types.is_datetime64_any_dtype(parsed):
+                parsed = pd.to_datetime(dates, errors='coerce')
+            if not pd.api.types.is_datetime64_any_dtype(parsed):
+                parsed = pd.to_datetime(dates, errors='coerce', utc=True)
+            dates = parsed
+        df_copy = df_copy.assign(**{'Date effective': dates}).dropna(subset=['Date effective'])
         
         if df_copy.empty:
             return pd.DataFrame(columns=['Année', 'Nombre de projets', 'Nom du projet', 'Dernière Note'])
         
         # Extract year
-        df_copy['Année'] = df_copy['Date effective'].dt.year
+        df_copy = df_copy.assign(**{'Année': df_copy['Date effective'].dt.year})
         
         # Select only the columns we need and rename them
         result_df = df_copy[['Année', 'Nom', 'Dernière Note']].copy()
@@ -203,21 +201,16 @@ class DataProcessor:
         result_df = result_df.sort_values(['Année', 'Nom du projet'])
         
         # Add count column for each year
-        result_df['Nombre de projets'] = result_df.groupby('Année')['Année'].transform('count')
-        
+        result_df['Nombre de projets'] = result_df.groupby('Année')['Nom du projet'].transform('size')
+
         # Clear project names and notes for 2024 and 2025
-        mask_2024_2025 = result_df['Année'].isin([2024, 2025])
-        result_df.loc[mask_2024_2025, 'Nom du projet'] = ''
-        result_df.loc[mask_2024_2025, 'Dernière Note'] = ''
-        
+        years = result_df['Année'].to_numpy()
+        mask_2024_2025 = (years == 2024) | (years == 2025)
+        result_df.loc[mask_2024_2025, ['Nom du projet', 'Dernière Note']] = ''
+
         # Clear year and count for rows after the first one in each year group
-        for year in result_df['Année'].unique():
-            year_mask = result_df['Année'] == year
-            year_indices = result_df[year_mask].index
-            if len(year_indices) > 1:
-                # Keep first row with year and count, clear others
-                result_df.loc[year_indices[1:], 'Année'] = ''
-                result_df.loc[year_indices[1:], 'Nombre de projets'] = ''
+        first_mask = ~result_df['Année'].duplicated()
+        result_df.loc[~first_mask, ['Année', 'Nombre de projets']] = ''
         
         # Reorder columns
         result_df = result_df[['Année', 'Nombre de projets', 'Nom du projet', 'Dernière Note']]
@@ -295,96 +288,78 @@ class DataProcessor:
             montant_dict (dict): Dictionary of montant total by project
 
         Returns:
-            pandas.DataFrame: The formatted resource summary
+            pandas.DataFrame: The formatted resource summary, with a boolean '_is_header'
+            column flagging resource rows (drop it before writing)
         """
-        # Create output DataFrame with all required columns
-        result_df = pd.DataFrame(columns=[
+        columns = [
             'Resource/ PROJET', 'Charge JH', 'Somme de Charge JH',
-            'Niveau de connexion', 'Phase du projet', 'Charge Theorique', 'Ecart','Montant total (Contrat) (Commande)','Dernière Note','Durée'
-        ])
+            'Niveau de connexion', 'Phase du projet', 'Charge Theorique', 'Ecart','Montant total (Contrat) (Commande)','Dernière Note','Durée',
+            '_is_header'
+        ]
 
-        current_resource = None
-        row_index = 0
-
-        # Sort by resource first, then by project
-        pivot_df = pivot_df.sort_values(['Ressource', 'Projet'])
-
-        # First pass: calculate all ecarts and store them
-        resource_ecarts = {}
-        
-        for _, row in pivot_df.iterrows():
-            resource = row['Ressource']
-            project = row['Projet']
-            charge = row['Charge JH']
-            
-            # Look up connection level and project phase for this project
-            connection_level = connection_dict.get(project, '')
-            project_phase = phase_dict.get(project, '')
-            
-            # Calculate theoretical charge if both values are available
-            theoretical_charge = None
-            if connection_level and project_phase:
-                theoretical_charge = DataProcessor.calculate_theoretical_charge(connection_level, project_phase)
-            
-            # Calculate ecart if theoretical charge is available
-            if theoretical_charge is not None:
-                ecart = theoretical_charge - charge
-                if resource not in resource_ecarts:
-                    resource_ecarts[resource] = []
-                resource_ecarts[resource].append(ecart)
-        
-        # Second pass: build the result DataFrame
-        for _, row in pivot_df.iterrows():
-            resource = row['Ressource']
-            project = row['Projet']
-            charge = row['Charge JH']
-            ca = row['Montant total (Contrat) (Commande)']
-            dn = row ['Dernière Note']
-            du = row['Durée']
-
-            # If this is a new resource, add the resource row
-            if resource != current_resource:
-                result_df.loc[row_index, 'Resource/ PROJET'] = resource
-                resource_charge = pivot_df[pivot_df['Ressource'] == resource]['Charge JH'].sum()
-                result_df.loc[row_index, 'Somme de Charge JH'] = resource_charge
-                
-                # Calculate sum of ecarts for this resource
-                if resource in resource_ecarts:
-                    ecart_sum = sum(resource_ecarts[resource])
-                    # Removed: result_df.loc[row_index, 'Somme des Ecarts'] = ecart_sum
-                
-                row_index += 1
-                current_resource = resource
-
-            # Look up connection level and project phase for this project
-            connection_level = connection_dict.get(project, '')
-            project_phase = phase_dict.get(project, '')
-
-            # Calculate theoretical charge if both values are available
-            theoretical_charge = None
-            if connection_level and project_phase:
-                theoretical_charge = DataProcessor.calculate_theoretical_charge(connection_level, project_phase)
-
-            # Add the project row indented under the resource
-            result_df.loc[row_index, 'Resource/ PROJET'] = f"    {project}"
-            result_df.loc[row_index, 'Charge JH'] = charge
-            result_df.loc[row_index, 'Niveau de connexion'] = connection_level
-            result_df.loc[row_index, 'Phase du projet'] = project_phase
-            result_df.loc[row_index, 'Montant total (Contrat) (Commande)'] = ca
-            result_df.loc[row_index, 'Dernière Note'] = dn
-            result_df.loc[row_index, 'Durée'] = du
-
-            if theoretical_charge is not None:
-                result_df.loc[row_index, 'Charge Theorique'] = theoretical_charge
-                # Calculate Ecart (Charge Theorique - Charge JH)
-                ecart = theoretical_charge - charge
-                result_df.loc[row_index, 'Ecart'] = ecart
-
-            row_index += 1
+        pivot_df = DataProcessor._prepare(pivot_df, [
+            'Ressource', 'Projet', 'Charge JH',
+            'Montant total (Contrat) (Commande)', 'Dernière Note', 'Durée'
+        ], ['Ressource'])
 
+        if pivot_df.empty:
+            return pd.DataFrame(columns=columns)
 
-
-        return result_df
+        # Sort by resource first, then by project
+        pivot_df = pivot_df.sort_values(['Ressource', 'Projet']).reset_index(drop=True)
+
+        # Look up connection level and project phase for every project at once
+        projects = pivot_df['Projet']
+        connection_levels = projects.map(connection_dict).fillna('')
+        project_phases = projects.map(phase_dict).fillna('')
+
+        # Normalize each distinct value once
+        normalized_connections = connection_levels.map({
+            value: DataProcessor.normalize_connection_level(value) for value in connection_levels.unique()
+        })
+        normalized_phases = project_phases.map({
+            value: DataProcessor.normalize_project_phase(value) for value in project_phases.unique()
+        })
+
+        # Gather theoretical charges from the dense rules array by category code (NaN when no rule matches)
+        connection_codes = pd.Categorical(normalized_connections, categories=THEORETICAL_CHARGE_CONNECTION_LEVELS).codes
+        phase_codes = pd.Categorical(normalized_phases, categories=THEORETICAL_CHARGE_PHASES).codes
+        theoretical_charges = pd.Series(
+            THEORETICAL_CHARGE_ARRAY[connection_codes, phase_codes], index=pivot_df.index
+        )
+
+        # Build the project rows, indented under their resource
+        project_rows = pd.DataFrame({
+            'Resource/ PROJET': '    ' + projects.astype(str),
+            'Charge JH': pivot_df['Charge JH'],
+            'Niveau de connexion': connection_levels,
+            'Phase du projet': project_phases,
+            'Charge Theorique': theoretical_charges,
+            # Ecart = Charge Theorique - Charge JH
+            'Ecart': theoretical_charges - pivot_df['Charge JH'],
+            'Montant total (Contrat) (Commande)': pivot_df['Montant total (Contrat) (Commande)'],
+            'Dernière Note': pivot_df['Dernière Note'],
+            'Durée': pivot_df['Durée'],
+            '_is_header': False,
+        }).reindex(columns=columns)
+
+        # Sum Charge JH per resource in a single pass
+        resource_totals = pivot_df.groupby('Ressource', sort=False, observed=True)['Charge JH'].sum()
+
+        resource_rows = pd.DataFrame({
+            'Resource/ PROJET': resource_totals.index.to_numpy(),
+            'Somme de Charge JH': resource_totals.to_numpy(),
+            '_is_header': True,
+        }).reindex(columns=columns)
+
+        # Each resource row goes right before its block of project rows, which shifts
+        # every project row down by the number of resource rows above it
+        is_first_project = ~pivot_df['Ressource'].duplicated()
+        block_numbers = is_first_project.cumsum()
+        resource_rows.index = (pivot_df.index + block_numbers - 1)[is_first_project].to_numpy()
+        project_rows.index = (pivot_df.index + block_numbers).to_numpy()
+
+        return pd.concat([resource_rows, project_rows]).sort_index().reset_index(drop=True)
 
     @staticmethod
     def create_theoretical_charge_by_resource_from_summary(resource_summary_df):
@@ -400,57 +375,41 @@ class DataProcessor:
         """
         if resource_summary_df.empty:
             return pd.DataFrame(columns=['Ressource', 'Somme Charge Théorique', 'Nombre de projets'])
-        
-        # Create result DataFrame
-        result_data = []
-        
-        current_resource = None
-        current_projects = []
-        current_theoretical_charges = []
-        
-        for _, row in resource_summary_df.iterrows():
-            resource_projet = str(row['Resource/ PROJET']) if pd.notna(row['Resource/ PROJET']) else ""
-            
-            # Check if this is a resource row (not indented, no leading spaces)
-            if not resource_projet.startswith('    ') and resource_projet.strip():
-                # If we have a previous resource, save their data
-                if current_resource is not None:
-                    theoretical_sum = sum([charge for charge in current_theoretical_charges if pd.notna(charge) and charge != 0])
-                    project_count = len(current_projects)
-                    result_data.append({
-                        'Ressource': current_resource,
-                        'Somme Charge Théorique': theoretical_sum,
-                        'Nombre de projets': project_count
-                    })
-                
-                # Start new resource
-                current_resource = resource_projet.strip()
-                current_projects = []
-                current_theoretical_charges = []
-            
-            # If this is a project row (indented with spaces)
-            elif resource_projet.startswith('    ') and current_resource is not None:
-                project_name = resource_projet.strip()
-                theoretical_charge = row.get('Charge Theorique', 0)
-                
-                current_projects.append(project_name)
-                current_theoretical_charges.append(theoretical_charge)
-        
-        # Don't forget the last resource
-        if current_resource is not None:
-            theoretical_sum = sum([charge for charge in current_theoretical_charges if pd.notna(charge) and charge != 0])
-            project_count = len(current_projects)
-            result_data.append({
-                'Ressource': current_resource,
-                'Somme Charge Théorique': theoretical_sum,
-                'Nombre de projets': project_count
-            })
-        
-        if not result_data:
+
+        labels = resource_summary_df['Resource/ PROJET'].fillna('').astype(str)
+
+        if '_is_header' in resource_summary_df.columns:
+            # Use the row flags set by format_resource_summary
+            is_header = resource_summary_df['_is_header'].astype(bool)
+            is_project = ~is_header
+        else:
+            # Resource rows are not indented, project rows are indented with spaces
+            is_project = labels.str.startswith('    ')
+            is_header = ~is_project & labels.str.strip().ne('')
+
+        if not is_header.any():
             return pd.DataFrame(columns=['Ressource', 'Somme Charge Théorique', 'Nombre de projets'])
-        
-        # Create DataFrame and sort by theoretical charge (highest to lowest)
-        result_df = pd.DataFrame(result_data)
+
+        # Number resource blocks so each project row is tied to the resource row above it
+        block_ids = is_header.cumsum()
+        is_project &= block_ids.gt(0)
+
+        if 'Charge Theorique' in resource_summary_df.columns:
+            theoretical_charges = pd.to_numeric(resource_summary_df['Charge Theorique'], errors='coerce')
+        else:
+            theoretical_charges = pd.Series(0, index=resource_summary_df.index)
+
+        # Sum theoretical charges (empty values are skipped) and count projects per resource
+        grouped = theoretical_charges[is_project].groupby(block_ids[is_project]).agg(['sum', 'size'])
+        grouped = grouped.reindex(block_ids[is_header], fill_value=0)
+
+        result_df = pd.DataFrame({
+            'Ressource': labels[is_header].str.strip().to_numpy(),
+            'Somme Charge Théorique': grouped['sum'].to_numpy(),
+            'Nombre de projets': grouped['size'].to_numpy()
+        })
+
+        # Sort by theoretical charge (highest to lowest)
         result_df = result_df.sort_values('Somme Charge Théorique', ascending=False)
-        
+
         return result_df
\ No newline at end of file
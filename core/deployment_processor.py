@@ -20,7 +20,7 @@ class DeploymentProcessor:
         Returns:
             tuple: (bool, list) - Success status and list of missing columns
         """
-        available_columns = df.columns.tolist()
+        available_columns = set(df.columns)
         missing_columns = [col for col in required_columns if col not in available_columns]
 
         return len(missing_columns) == 0, missing_columns
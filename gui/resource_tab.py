@@ -188,8 +188,8 @@ class ResourceSummaryWorker(QThread):
             theoretical_charge_df = DataProcessor.create_theoretical_charge_by_resource_from_summary(result_df)
             
             ExcelHandler.write_multiple_sheets({
-                'Resource Summary': result_df,
-                'High CA': high_ca_df,
+                'Resource Summary': result_df.drop(columns=['_is_header']),
+                'High CA': high_ca_df.drop(columns=['_is_header']),
                 'Projets par ans': projects_by_year_df,
                 'Charge Théorique par Consultant': theoretical_charge_df
             }, self.output_file)
@@ -200,8 +200,8 @@ class ResourceSummaryWorker(QThread):
             # Bar chart: Charge JH par consultant
             col_proj = 'Resource/ PROJET'
             col_jh = 'Somme de Charge JH'
-            # Only use rows where 'Somme de Charge JH' is notna and 'Resource/ PROJET' is not indented
-            chart_data = result_df[(result_df[col_jh].notna()) & (~result_df[col_proj].str.startswith('    '))]
+            # Only use resource rows where 'Somme de Charge JH' is notna
+            chart_data = result_df[(result_df[col_jh].notna()) & result_df['_is_header']]
             if not chart_data.empty:
                 fig1, ax1 = plt.subplots(figsize=(6, 3))
                 ax1.bar(chart_data[col_proj].astype(str), chart_data[col_jh])
@@ -214,8 +214,8 @@ class ResourceSummaryWorker(QThread):
             # Bar chart: Somme Ecart par consultant
             col_somme_ecart = 'Somme de Ecart'
             if col_somme_ecart in result_df.columns:
-                # Only use rows where 'Somme de Ecart' is notna and 'Resource/ PROJET' is not indented
-                ecart_chart_data = result_df[(result_df[col_somme_ecart].notna()) & (~result_df[col_proj].str.startswith('    '))]
+                # Only use resource rows where 'Somme de Ecart' is notna
+                ecart_chart_data = result_df[(result_df[col_somme_ecart].notna()) & result_df['_is_header']]
                 if not ecart_chart_data.empty:
                     fig3, ax3 = plt.subplots(figsize=(6, 3))
                     bars = ax3.bar(ecart_chart_data[col_proj].astype(str), ecart_chart_data[col_somme_ecart])
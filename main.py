@@ -91,7 +91,7 @@ def generate_resource_summary():
 
         # Write to Excel
         print(f"\nWriting results to '{output_file}'...")
-        ExcelHandler.write_excel(result_df, output_file, 'Resource Summary')
+        ExcelHandler.write_excel(result_df.drop(columns=['_is_header']), output_file, 'Resource Summary')
 
         print(f"\nSuccess! Results saved to {output_file}")
 